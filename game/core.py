@@ -1,55 +1,167 @@
-import pygame
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 from dataclasses import dataclass
+import logging
 import os
+import re
+from functools import lru_cache
+from .core_fast import LEN_MASK, can_push, push, remove_at, single_color, slot
 
-@dataclass
+_log = logging.getLogger(__name__)
+
+__all__ = ["CakeLayer", "Tube", "CakeGame", "COLORS", "COLOR_IDX", "color_index",
+           "encode_layer", "decode_layer", "make_layer"]
+
+# Color letters by their 4-bit index in packed tube words (see core_fast)
+COLORS: List[str] = list("RGBYPOCM")
+COLOR_IDX: Dict[str, int] = {color: idx for idx, color in enumerate(COLORS)}
+
+@dataclass(frozen=True, slots=True)
 class CakeLayer:
-    color: str
+    color: int  # index into COLORS
     size: int
 
     def __str__(self):
-        return f"{self.color}{self.size}"
+        return f"{COLORS[self.color]}{self.size}"
+
+def color_index(color: str) -> int:
+    """Map a color letter to its 4-bit index, registering new letters"""
+    idx = COLOR_IDX.get(color)
+    if idx is None:
+        if len(COLORS) == 16:
+            raise ValueError(f"Too many colors to pack, cannot add {color!r}")
+        idx = COLOR_IDX[color] = len(COLORS)
+        COLORS.append(color)
+    return idx
+
+def encode_layer(layer: CakeLayer) -> int:
+    """Pack a layer into one 8-bit slot"""
+    if not 0 <= layer.size <= 0xF:
+        raise ValueError(f"Layer size {layer.size} does not fit in 4 bits")
+    return (layer.color << 4) | layer.size
+
+@lru_cache(maxsize=None)
+def make_layer(color: int, size: int) -> CakeLayer:
+    """Interned CakeLayer: equal layers are the same object"""
+    return CakeLayer(color, size)
+
+@lru_cache(maxsize=None)
+def decode_layer(code: int) -> CakeLayer:
+    """Unpack an 8-bit slot into a CakeLayer"""
+    return make_layer(code >> 4, code & 0xF)
+
+# "<tube>: <layer> <layer> ..." lines, and "<color letter><size>" layer tokens
+_TUBE_RE = re.compile(r'^[ \t]*(\d+)[ \t]*:([^:\n]*)', re.M)
+_LAYER_RE = re.compile(r'([A-Za-z])(\d*)')
+
+@lru_cache(maxsize=32)
+def _parse_level(level_file: str, mtime: float) -> Tuple[Tuple[int, Tuple[CakeLayer, ...]], ...]:
+    """Read a level file in one go; cached until the file's mtime changes"""
+    with open(level_file, 'r') as f:
+        data = f.read()
+    
+    tubes = [(int(tube_match.group(1)), _LAYER_RE.findall(tube_match.group(2)))
+             for tube_match in _TUBE_RE.finditer(data)]
+    
+    # Packed slots hold 4-bit colors and sizes; check the whole file before
+    # registering any new color letters
+    new_colors = {color.upper() for _, tokens in tubes for color, _ in tokens} - COLOR_IDX.keys()
+    if len(COLORS) + len(new_colors) > 16:
+        raise ValueError(f"more than 16 colors in use, {sorted(new_colors)} would not fit")
+    for tube_idx, tokens in tubes:
+        for color, size in tokens:
+            if size and int(size) > 0xF:
+                raise ValueError(f"layer {color}{size} on tube {tube_idx} is larger than 15")
+    
+    level = []
+    for tube_idx, tokens in tubes:
+        layers = tuple(make_layer(color_index(color.upper()), int(size) if size else 1)
+                       for color, size in tokens)
+        level.append((tube_idx, layers))
+    return tuple(level)
 
 class Tube:
-    def __init__(self, max_capacity: int = 6):
-        self.layers: List[CakeLayer] = []
+    """A plate of stacked cake layers, packed into a single int.
+    
+    add_layer only accepts a layer matching the top colour, so a tube
+    filled through it is always single-coloured and a full tube is a
+    complete one. load() can bypass that check and flags mixed states.
+    """
+    __slots__ = ("state", "_mixed", "max_capacity", "tube_idx", "on_change")
+    
+    def __init__(self, max_capacity: int = 6, tube_idx: int = 0,
+                 on_change: Optional[Callable[[int], None]] = None):
+        if max_capacity > LEN_MASK:
+            raise ValueError(f"Tube capacity {max_capacity} does not fit in 4 bits")
+        self.state = 0
+        self._mixed = False
         self.max_capacity = max_capacity
+        self.tube_idx = tube_idx
+        self.on_change = on_change
+    
+    @property
+    def layers(self) -> List[CakeLayer]:
+        """Layers from bottom to top, decoded from the packed state"""
+        state = self.state
+        return [decode_layer(slot(state, pos)) for pos in range(state & LEN_MASK)]
     
     def can_add(self, layer: CakeLayer) -> bool:
         """Check if we can add this layer to the top"""
-        return (len(self.layers) < self.max_capacity and 
-                (self.is_empty() or self.top_layer().color == layer.color))
+        return can_push(self.state, layer.color, self.max_capacity)
     
     def add_layer(self, layer: CakeLayer) -> bool:
         """Add layer to the top (stack behavior)"""
         if self.can_add(layer):
-            self.layers.append(layer)
+            self.state = push(self.state, encode_layer(layer))
+            if self.on_change:
+                self.on_change(self.tube_idx)
             return True
         return False
     
     def remove_layer(self, index: int) -> Optional[CakeLayer]:
         """Remove layer from any position (list behavior)"""
-        if 0 <= index < len(self.layers):
-            return self.layers.pop(index)
+        if 0 <= index < self.state & LEN_MASK:
+            code = slot(self.state, index)
+            self.state = remove_at(self.state, index)
+            if self.on_change:
+                self.on_change(self.tube_idx)
+            return decode_layer(code)
+        return None
+    
+    def clear(self):
+        """Empty the tube in place"""
+        self.load(0)
+    
+    def load(self, state: int):
+        """Replace the whole packed state at once"""
+        self.state = state
+        self._mixed = not single_color(state)
+        if self.on_change:
+            self.on_change(self.tube_idx)
+    
+    def layer_at(self, index: int) -> Optional[CakeLayer]:
+        """Get the layer at a position without removing it"""
+        if 0 <= index < self.state & LEN_MASK:
+            return decode_layer(slot(self.state, index))
         return None
     
     def top_layer(self) -> Optional[CakeLayer]:
         """Get top layer without removing it"""
-        return self.layers[-1] if self.layers else None
+        count = self.state & LEN_MASK
+        if count == 0:
+            return None
+        return decode_layer(slot(self.state, count - 1))
     
     def is_empty(self) -> bool:
-        return len(self.layers) == 0
+        return self.state & LEN_MASK == 0
     
     def is_full(self) -> bool:
-        return len(self.layers) == self.max_capacity
+        return self.state & LEN_MASK == self.max_capacity
     
     def is_complete(self) -> bool:
         """All layers same color and filled to capacity"""
-        if not self.is_full():
-            return False
-        first_color = self.layers[0].color if self.layers else None
-        return all(layer.color == first_color for layer in self.layers)
+        if self._mixed:
+            return self.is_full() and single_color(self.state)
+        return self.is_full()
     
     def __str__(self):
         return " ".join(str(layer) for layer in self.layers)
@@ -59,37 +171,49 @@ class CakeGame:
         self.width = width
         self.height = height
         self.max_capacity = max_capacity
-        self.tubes: List[Tube] = [Tube(max_capacity) for _ in range(width * height)]
+        self._adjacency = self._build_adjacency()
+        self._symmetries = self._build_symmetries()
+        self.tubes: List[Tube] = self._new_tubes()
         self.moves = 0
         self.selected_tube = None
         self.selected_layer_pos = None
     
+    def _new_tubes(self) -> List[Tube]:
+        """Create empty tubes wired to the settled-tube count"""
+        self._settled = [True] * (self.width * self.height)
+        self._unsettled = 0
+        return [Tube(self.max_capacity, idx, self._on_tube_change)
+                for idx in range(self.width * self.height)]
+    
+    def _on_tube_change(self, tube_idx: int):
+        """Track whether a changed tube is still settled"""
+        tube = self.tubes[tube_idx]
+        settled = tube.is_empty() or tube.is_complete()
+        if settled != self._settled[tube_idx]:
+            self._settled[tube_idx] = settled
+            self._unsettled += -1 if settled else 1
+    
     def initialize_level(self, level_file: str):
         """Load level with specified color distribution"""
-        self.tubes = [Tube(self.max_capacity) for _ in range(self.width * self.height)]
+        # Reuse the existing tubes rather than allocating a fresh set
+        for tube in self.tubes:
+            tube.clear()
         self.moves = 0
         
         try:
-            with open(level_file, 'r') as f:
-                for line in f:
-                    if line.startswith('#') or not line.strip():
-                        continue
-                    
-                    parts = line.strip().split(':')
-                    if len(parts) < 2:
-                        continue
-                        
-                    tube_idx, layers_str = parts[0], parts[1]
-                    tube = self.tubes[int(tube_idx)]
-                    
-                    for layer_str in layers_str.split():
-                        if not layer_str:
-                            continue
-                        color = layer_str[0].upper()
-                        size = int(layer_str[1:]) if len(layer_str) > 1 else 1
-                        tube.add_layer(CakeLayer(color, size))
+            level = _parse_level(level_file, os.path.getmtime(level_file))
         except FileNotFoundError:
-            print(f"Error: Level file {level_file} not found")
+            _log.error("Level file %s not found", level_file)
+            return
+        except ValueError as exc:
+            _log.error("Level file %s cannot be loaded: %s", level_file, exc)
+            return
+        
+        for tube_idx, layers in level:
+            tube = self.tubes[tube_idx]
+            for layer in layers:
+                tube.add_layer(layer)
+        _log.debug("Loaded %s: %d tubes described", level_file, len(level))
     
     def move_layer(self, from_idx: int, layer_pos: int, to_idx: int) -> bool:
         """Move layer from one tube to another"""
@@ -101,39 +225,68 @@ class CakeGame:
         from_tube = self.tubes[from_idx]
         to_tube = self.tubes[to_idx]
         
-        layer = from_tube.remove_layer(layer_pos)
-        if layer is None:
+        # Validate before mutating so a rejected move costs nothing to undo
+        layer = from_tube.layer_at(layer_pos)
+        if layer is None or not to_tube.can_add(layer):
             return False
             
-        if to_tube.add_layer(layer):
-            self.moves += 1
-            return True
-        else:
-            # Revert if move failed
-            from_tube.layers.insert(layer_pos, layer)
-            return False
+        from_tube.remove_layer(layer_pos)
+        to_tube.add_layer(layer)
+        self.moves += 1
+        return True
     
     def is_solved(self) -> bool:
         """Check if all tubes are complete or empty"""
-        return all(tube.is_complete() or tube.is_empty() for tube in self.tubes)
+        return self._unsettled == 0
     
     def get_state_hash(self) -> str:
         """Get unique string representation of current state"""
         return "|".join(str(tube) for tube in self.tubes)
     
-    def get_adjacent_tubes(self, tube_idx: int) -> List[int]:
+    def get_state(self) -> Tuple[int, ...]:
+        """Snapshot of every tube's packed state, restorable with set_state"""
+        return tuple(tube.state for tube in self.tubes)
+    
+    def set_state(self, state: Tuple[int, ...]):
+        """Restore a snapshot taken with get_state"""
+        for tube, packed in zip(self.tubes, state):
+            tube.load(packed)
+    
+    def get_adjacent_tubes(self, tube_idx: int) -> Tuple[int, ...]:
         """Get indices of adjacent tubes (up, down, left, right)"""
-        row = tube_idx // self.width
-        col = tube_idx % self.width
-        adjacent = []
-        
-        if row > 0:
-            adjacent.append(tube_idx - self.width)  # Up
-        if row < self.height - 1:
-            adjacent.append(tube_idx + self.width)  # Down
-        if col > 0:
-            adjacent.append(tube_idx - 1)          # Left
-        if col < self.width - 1:
-            adjacent.append(tube_idx + 1)          # Right
+        return self._adjacency[tube_idx]
+    
+    def get_symmetries(self) -> Tuple[Tuple[int, ...], ...]:
+        """Tube orderings under which the grid's adjacency is unchanged"""
+        return self._symmetries
+    
+    def _build_symmetries(self) -> Tuple[Tuple[int, ...], ...]:
+        """Tube orderings for the identity, horizontal, vertical and double flips"""
+        perms = set()
+        for flip_rows in (False, True):
+            for flip_cols in (False, True):
+                perms.add(tuple(
+                    (self.height - 1 - row if flip_rows else row) * self.width
+                    + (self.width - 1 - col if flip_cols else col)
+                    for row in range(self.height) for col in range(self.width)))
+        return tuple(sorted(perms))
+    
+    def _build_adjacency(self) -> Tuple[Tuple[int, ...], ...]:
+        """Precompute the neighbours of every tube on the fixed grid"""
+        table = []
+        for tube_idx in range(self.width * self.height):
+            row = tube_idx // self.width
+            col = tube_idx % self.width
+            adjacent = []
+            
+            if row > 0:
+                adjacent.append(tube_idx - self.width)  # Up
+            if row < self.height - 1:
+                adjacent.append(tube_idx + self.width)  # Down
+            if col > 0:
+                adjacent.append(tube_idx - 1)          # Left
+            if col < self.width - 1:
+                adjacent.append(tube_idx + 1)          # Right
             
-        return adjacent
\ No newline at end of file
+            table.append(tuple(adjacent))
+        return tuple(table)
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""Pure-int operations on packed tube words.
+
+A tube word is LEN[3:0] | SLOT0[11:4] | SLOT1[19:12] | ..., each 8-bit
+slot holding COLOR[7:4] | SIZE[3:0]. Everything here takes and returns
+plain ints (or tuples of them), so search code can work on whole boards
+without building Tube or CakeGame objects.
+
+A whole board packs the same way into one int, tube i occupying bits
+[i*TB, (i+1)*TB) with TB = tube_bits(max_capacity).
+"""
+from typing import Sequence, Tuple
+
+LEN_MASK = 0xF
+SLOT_BITS = 8
+
+def slot(word: int, pos: int) -> int:
+    """8-bit layer code at a position (0 is the bottom)"""
+    return (word >> (4 + SLOT_BITS * pos)) & 0xFF
+
+def slots(word: int) -> Tuple[int, ...]:
+    """Every 8-bit layer code, bottom first"""
+    return tuple((word >> (4 + SLOT_BITS * pos)) & 0xFF for pos in range(word & LEN_MASK))
+
+def top_color(word: int) -> int:
+    """Color index of the top layer; only meaningful for a non-empty word"""
+    return (word >> (SLOT_BITS * (word & LEN_MASK))) & 0xF
+
+def can_push(word: int, color: int, max_capacity: int) -> bool:
+    """Check if a layer of this color fits on top"""
+    count = word & LEN_MASK
+    if count >= max_capacity:
+        return False
+    return count == 0 or (word >> (SLOT_BITS * count)) & 0xF == color
+
+def push(word: int, code: int) -> int:
+    """Put a layer code on top (no rule checks)"""
+    return (word + 1) | (code << (4 + SLOT_BITS * (word & LEN_MASK)))
+
+def remove_at(word: int, pos: int) -> int:
+    """Drop the layer at a position and close the gap"""
+    shift = 4 + SLOT_BITS * pos
+    low = word & ((1 << shift) - 1)
+    high = word >> (shift + SLOT_BITS)
+    return (low | (high << shift)) - 1
+
+# Per tube length: mask selecting every slot's color nibble, and the value
+# that broadcasts a color index into all of those nibbles when multiplied
+COLOR_MASKS = tuple(sum(0xF0 << (SLOT_BITS * i) for i in range(count))
+                    for count in range(LEN_MASK + 1))
+COLOR_UNITS = tuple(sum(0x10 << (SLOT_BITS * i) for i in range(count))
+                    for count in range(LEN_MASK + 1))
+
+def single_color(word: int) -> bool:
+    """Compare every slot's color nibble against the bottom one at once"""
+    count = word & LEN_MASK
+    slots = word >> 4
+    return slots & COLOR_MASKS[count] == (slots >> 4 & 0xF) * COLOR_UNITS[count]
+
+def is_complete(word: int, max_capacity: int) -> bool:
+    """Full and single-colored"""
+    return word & LEN_MASK == max_capacity and single_color(word)
+
+def is_solved(words: Sequence[int], max_capacity: int) -> bool:
+    """Every tube is empty or complete"""
+    return all(word & LEN_MASK == 0 or is_complete(word, max_capacity) for word in words)
+
+def tube_bits(max_capacity: int) -> int:
+    """Width of one tube word: the length nibble plus every slot"""
+    return 4 + SLOT_BITS * max_capacity
+
+def pack_state(words: Sequence[int], bits: int) -> int:
+    """Concatenate tube words into one int, tube 0 in the low bits"""
+    state = 0
+    for word in reversed(words):
+        state = (state << bits) | word
+    return state
+
+def unpack_state(state: int, num_tubes: int, bits: int) -> Tuple[int, ...]:
+    """Split a packed board back into its tube words"""
+    mask = (1 << bits) - 1
+    return tuple((state >> (bits * idx)) & mask for idx in range(num_tubes))
@@ -1,149 +1,278 @@
-from .core import CakeGame, Tube
-from typing import List, Tuple, Dict, Optional
+from .core import CakeGame
+from .core_fast import (COLOR_MASKS, LEN_MASK, SLOT_BITS, can_push, is_complete, is_solved, pack_state,
+                        push, remove_at, slot, top_color, tube_bits, unpack_state)
+from typing import Callable, Iterator, List, Tuple, Dict, Optional
 import heapq
-import time
+import math
+import threading
+from operator import itemgetter
 from collections import deque
 
+# Search states are whole boards packed into one int (see core_fast)
+State = int
+Move = Tuple[int, int, int]
+
+def _zero_heuristic(words: Tuple[int, ...]) -> int:
+    """Uninformed fallback for unknown heuristic names"""
+    return 0
+
 class GameSolver:
-    def __init__(self, game: CakeGame):
+    def __init__(self, game: CakeGame, canonicalize: bool = True):
         self.game = game
+        self._num_tubes = game.width * game.height
+        self._bits = tube_bits(game.max_capacity)
+        # With canonicalize, visited/g_score keys ignore layer sizes (they never
+        # decide a move or a win) and mirror images of the grid; turn it off
+        # for level rules where either would matter
+        self.canonicalize = canonicalize
+        perms = game.get_symmetries() if canonicalize else (tuple(range(self._num_tubes)),)
+        # itemgetter reorders a whole word tuple per symmetry in one C call
+        self._mirrors = tuple(itemgetter(*perm) if len(perm) > 1 else tuple
+                              for perm in perms)
+        self._key_mask = (COLOR_MASKS[LEN_MASK] << 4) | LEN_MASK if canonicalize else -1
+        # Neighbour lists, fixed for the grid, in get_adjacent_tubes order
+        self._adjacency = tuple(game.get_adjacent_tubes(idx) for idx in range(self._num_tubes))
     
-    def solve_bfs(self) -> Optional[List[Tuple[int, int, int]]]:
-        """Breadth-First Search solver"""
+    def solve_bfs(self, cancel: Optional[threading.Event] = None) -> Optional[List[Tuple[int, int, int]]]:
+        """Breadth-First Search solver; setting cancel stops it with None"""
         queue = deque()
         visited = set()
         parent = {}
         move_history = {}
+        max_capacity = self.game.max_capacity
         
-        initial_state = self.game.get_state_hash()
+        # visited holds canonical states so mirror images are explored once
+        initial_words = self.game.get_state()
+        initial_state = pack_state(initial_words, self._bits)
         queue.append(initial_state)
-        visited.add(initial_state)
+        visited.add(self._canonical(initial_words))
         parent[initial_state] = None
         
         while queue:
+            if cancel is not None and cancel.is_set():
+                return None
             current_state = queue.popleft()
+            words = self._decode(current_state)
             
-            # Reconstruct game state
-            temp_game = CakeGame(self.game.width, self.game.height, self.game.max_capacity)
-            self._load_state(temp_game, current_state)
-            
-            if temp_game.is_solved():
+            if is_solved(words, max_capacity):
                 return self._reconstruct_path(parent, move_history, current_state)
             
-            # Generate all possible moves
-            for from_idx, from_tube in enumerate(temp_game.tubes):
-                if from_tube.is_empty():
-                    continue
-                
-                # Can remove any layer (list behavior)
-                for layer_pos in range(len(from_tube.layers)):
-                    for to_idx in temp_game.get_adjacent_tubes(from_idx):
-                        # Create new game state for simulation
-                        new_game = CakeGame(temp_game.width, temp_game.height, temp_game.max_capacity)
-                        self._load_state(new_game, current_state)
-                        
-                        if new_game.move_layer(from_idx, layer_pos, to_idx):
-                            new_state = new_game.get_state_hash()
-                            if new_state not in visited:
-                                visited.add(new_state)
-                                parent[new_state] = current_state
-                                move_history[new_state] = (from_idx, layer_pos, to_idx)
-                                queue.append(new_state)
+            for move, new_state, new_words in self._successors(current_state, words):
+                new_class = self._canonical(new_words)
+                if new_class not in visited:
+                    visited.add(new_class)
+                    parent[new_state] = current_state
+                    move_history[new_state] = move
+                    queue.append(new_state)
         
         return None
     
-    def solve_a_star(self, heuristic_fn: str = 'basic') -> Optional[List[Tuple[int, int, int]]]:
-        """A* Search with selectable heuristic"""
+    def solve_a_star(self, heuristic_fn: str = 'basic',
+                     cancel: Optional[threading.Event] = None) -> Optional[List[Tuple[int, int, int]]]:
+        """A* Search with selectable heuristic; setting cancel stops it with None"""
         open_set = []
-        heapq.heappush(open_set, (0, self.game.get_state_hash()))
+        max_capacity = self.game.max_capacity
+        heuristic = self._heuristic_for(heuristic_fn)
+        initial_words = self.game.get_state()
+        initial_state = pack_state(initial_words, self._bits)
+        # Heap entries carry their own g, so no f_score table is needed
+        heapq.heappush(open_set, (0, 0, initial_state))
         
-        came_from = {}
-        g_score = {self.game.get_state_hash(): 0}
-        f_score = {self.game.get_state_hash(): self._get_heuristic(self.game, heuristic_fn)}
+        # Scores are kept per canonical state so equivalent boards share them
+        came_from = {initial_state: None}
+        move_history = {}
+        g_score = {self._canonical(initial_words): 0}
         
         while open_set:
-            _, current_state = heapq.heappop(open_set)
-            
-            temp_game = CakeGame(self.game.width, self.game.height, self.game.max_capacity)
-            self._load_state(temp_game, current_state)
+            if cancel is not None and cancel.is_set():
+                return None
+            _, current_g, current_state = heapq.heappop(open_set)
+            words = self._decode(current_state)
+            # A cheaper path to this board was pushed after this entry
+            if current_g > g_score[self._canonical(words)]:
+                continue
             
-            if temp_game.is_solved():
-                return self._reconstruct_path(came_from, {}, current_state)
+            if is_solved(words, max_capacity):
+                return self._reconstruct_path(came_from, move_history, current_state)
             
-            # Generate all possible moves
-            for from_idx, from_tube in enumerate(temp_game.tubes):
-                if from_tube.is_empty():
-                    continue
+            for move, new_state, new_words in self._successors(current_state, words):
+                new_class = self._canonical(new_words)
+                tentative_g = current_g + 1
                 
-                for layer_pos in range(len(from_tube.layers)):
-                    for to_idx in temp_game.get_adjacent_tubes(from_idx):
-                        new_game = CakeGame(temp_game.width, temp_game.height, temp_game.max_capacity)
-                        self._load_state(new_game, current_state)
-                        
-                        if new_game.move_layer(from_idx, layer_pos, to_idx):
-                            new_state = new_game.get_state_hash()
-                            tentative_g = g_score[current_state] + 1
-                            
-                            if new_state not in g_score or tentative_g < g_score[new_state]:
-                                came_from[new_state] = current_state
-                                g_score[new_state] = tentative_g
-                                f_score[new_state] = tentative_g + self._get_heuristic(new_game, heuristic_fn)
-                                heapq.heappush(open_set, (f_score[new_state], new_state))
+                if new_class not in g_score or tentative_g < g_score[new_class]:
+                    came_from[new_state] = current_state
+                    move_history[new_state] = move
+                    g_score[new_class] = tentative_g
+                    f = tentative_g + heuristic(new_words)
+                    heapq.heappush(open_set, (f, tentative_g, new_state))
         
         return None
     
-    def _get_heuristic(self, game: CakeGame, heuristic_fn: str) -> float:
-        """Calculate heuristic value for state"""
+    def solve_ida_star(self, heuristic_fn: str = 'basic',
+                       cancel: Optional[threading.Event] = None) -> Optional[List[Tuple[int, int, int]]]:
+        """Iterative-deepening A*: depth-first under a growing f bound.
+        
+        There is no open set or visited map: cycles are checked against the
+        current path only, and the price is re-expanding shallow nodes on
+        each pass. The only other memory is the set of boards a pass cut off
+        at the bound (bounded by the search frontier). If all of them were
+        also expanded in that pass, the boards searched are closed under
+        moves and there is no solution.
+        
+        That test can only pass once the bound covers every reachable board,
+        so an unsolvable level may take exponentially long to report None
+        (seconds to minutes even on 2x2 and 2x3 grids). Use BFS or A* to
+        prove a level unsolvable, or set cancel, which stops the search and
+        returns None.
+        """
+        max_capacity = self.game.max_capacity
+        heuristic = self._heuristic_for(heuristic_fn)
+        initial_words = self.game.get_state()
+        initial_state = pack_state(initial_words, self._bits)
+        on_path = {initial_state}
+        moves = []
+        bound = heuristic(initial_words)
+        # Canonical boards cut off at the bound this pass, mapped to whether
+        # they were also expanded in it. Expansions before the cut are only
+        # seen for boards the previous pass cut (watch), so the test may
+        # need one pass more than strictly necessary
+        cut = {}
+        watch = set()
+        expanded = set()
+        
+        def search(state: State, words: Tuple[int, ...], g: int) -> Optional[float]:
+            """None once solved or cancelled, else the smallest f that exceeded the bound"""
+            if is_solved(words, max_capacity) or (cancel is not None and cancel.is_set()):
+                return None
+            minimum = math.inf
+            for move, new_state, new_words in self._successors(state, words):
+                if new_state in on_path:
+                    continue
+                new_class = self._canonical(new_words)
+                f = g + 1 + heuristic(new_words)
+                if f > bound:
+                    minimum = min(minimum, f)
+                    if not cut.get(new_class):
+                        cut[new_class] = new_class in expanded
+                    continue
+                if new_class in cut:
+                    cut[new_class] = True
+                elif new_class in watch:
+                    expanded.add(new_class)
+                
+                on_path.add(new_state)
+                moves.append(move)
+                result = search(new_state, new_words, g + 1)
+                if result is None:
+                    return None
+                moves.pop()
+                on_path.remove(new_state)
+                minimum = min(minimum, result)
+            return minimum
+        
+        while True:
+            watch.clear()
+            watch.update(cut)
+            cut.clear()
+            expanded.clear()
+            result = search(initial_state, initial_words, 0)
+            if result is None:
+                return None if cancel is not None and cancel.is_set() else moves
+            if result == math.inf or all(cut.values()):
+                return None
+            bound = result
+    
+    def _successors(self, state: State, words: Tuple[int, ...]
+                    ) -> Iterator[Tuple[Move, State, Tuple[int, ...]]]:
+        """Every legal move from a state, with the state (and its words) it leads to"""
+        max_capacity = self.game.max_capacity
+        bits = self._bits
+        merge_runs = self.canonicalize
+        adjacency = self._adjacency
+        for from_idx, word in enumerate(words):
+            count = word & LEN_MASK
+            # Full neighbours can never take a layer, whichever one we pick
+            targets = [(to_idx, words[to_idx]) for to_idx in adjacency[from_idx]
+                       if words[to_idx] & LEN_MASK < max_capacity]
+            if not count or not targets:
+                continue
+            
+            # Can remove any layer (list behavior). Within a run of one color
+            # every choice leaves the same colors behind, and sizes never
+            # affect what is legal or solved, so only the deepest is tried.
+            below = -1
+            for layer_pos in range(count):
+                code = slot(word, layer_pos)
+                if code >> 4 == below:
+                    continue
+                if merge_runs:
+                    below = code >> 4
+                new_src = remove_at(word, layer_pos)
+                src_delta = (word ^ new_src) << (bits * from_idx)
+                for to_idx, dst in targets:
+                    if not can_push(dst, code >> 4, max_capacity):
+                        continue
+                    new_dst = push(dst, code)
+                    new_words = list(words)
+                    new_words[from_idx] = new_src
+                    new_words[to_idx] = new_dst
+                    # Only two tubes changed, so patch their fields in place
+                    new_state = state ^ src_delta ^ ((dst ^ new_dst) << (bits * to_idx))
+                    yield (from_idx, layer_pos, to_idx), new_state, tuple(new_words)
+    
+    def _canonical(self, words: Tuple[int, ...]) -> State:
+        """Packed key shared by every equivalent board"""
+        mask = self._key_mask
+        words = tuple([word & mask for word in words])
+        return pack_state(min(mirror(words) for mirror in self._mirrors), self._bits)
+    
+    def _decode(self, state: State) -> Tuple[int, ...]:
+        """Tube words of a packed state"""
+        return unpack_state(state, self._num_tubes, self._bits)
+    
+    def _heuristic_for(self, heuristic_fn: str) -> Callable[[Tuple[int, ...]], float]:
+        """Resolve a heuristic name once, so searches skip the lookup per node"""
         if heuristic_fn == 'basic':
-            return self._basic_heuristic(game)
+            return self._basic_heuristic
         elif heuristic_fn == 'advanced':
-            return self._advanced_heuristic(game)
+            return self._advanced_heuristic
         else:
-            return 0
+            return _zero_heuristic
     
-    def _basic_heuristic(self, game: CakeGame) -> int:
+    def _basic_heuristic(self, words: Tuple[int, ...]) -> int:
         """Count of non-complete tubes"""
-        return sum(1 for tube in game.tubes if not tube.is_complete() and not tube.is_empty())
+        max_capacity = self.game.max_capacity
+        return sum(1 for word in words if word & LEN_MASK and not is_complete(word, max_capacity))
     
-    def _advanced_heuristic(self, game: CakeGame) -> int:
+    def _advanced_heuristic(self, words: Tuple[int, ...]) -> int:
         """More sophisticated heuristic considering color diversity and blocking"""
+        max_capacity = self.game.max_capacity
         score = 0
-        for tube in game.tubes:
-            if tube.is_complete():
+        for word in words:
+            if is_complete(word, max_capacity):
                 continue
-                
-            # Color diversity penalty
-            colors = set(layer.color for layer in tube.layers)
-            score += len(colors) * 2
             
-            # Blocking penalty
-            if tube.layers:
-                target_color = tube.layers[-1].color
-                for layer in reversed(tube.layers):
-                    if layer.color != target_color:
-                        score += 1
+            # One pass over the color nibbles collects both the set of colors
+            # (as a bitmask, for the diversity penalty) and the blocking count
+            target_color = top_color(word)
+            seen = 0
+            blocking = 0
+            colors = word >> 8
+            for _ in range(word & LEN_MASK):
+                color = colors & 0xF
+                seen |= 1 << color
+                if color != target_color:
+                    blocking += 1
+                colors >>= SLOT_BITS
+            score += seen.bit_count() * 2 + blocking
         return score
     
-    def _load_state(self, game: CakeGame, state_str: str):
-        """Load game state from string representation"""
-        tube_strs = state_str.split('|')
-        game.tubes = []
-        for tube_str in tube_strs:
-            tube = Tube(game.max_capacity)
-            layers = tube_str.split()
-            for layer in layers:
-                if layer:  # Skip empty strings
-                    color = layer[0].lower()
-                    size = int(layer[1:])
-                    tube.add_layer(CakeLayer(color, size))
-            game.tubes.append(tube)
-    
-    def _reconstruct_path(self, parent: Dict[str, str], moves: Dict[str, Tuple[int, int, int]], 
-                         end_state: str) -> List[Tuple[int, int, int]]:
+    def _reconstruct_path(self, parent: Dict[State, State], moves: Dict[State, Move],
+                         end_state: State) -> List[Tuple[int, int, int]]:
         """Reconstruct solution path from search"""
         path = []
         current = end_state
         while parent[current] is not None:
             path.append(moves[current])
             current = parent[current]
-        return path[::-1]
\ No newline at end of file
+        return path[::-1]
@@ -1,35 +1,96 @@
 import pygame
-from typing import Tuple
+from typing import Dict, Iterable, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+
+__all__ = ["load_image", "preload_images", "render_text", "draw_text",
+           "invalidate_text_cache", "create_gradient"]
+
+# Converted images by (path, scale); needs a display mode to be set first
+_image_cache: Dict[Tuple[str, float], pygame.Surface] = {}
 
 def load_image(path: str, scale: float = 1.0) -> pygame.Surface:
-    """Load and scale an image"""
+    """Load and scale an image
+    
+    Each (path, scale) is decoded and converted once and the same surface
+    is returned afterwards, so callers that draw onto it must copy() it.
+    """
+    key = (path, scale)
+    image = _image_cache.get(key)
+    if image is not None:
+        return image
     try:
         image = pygame.image.load(path)
         if scale != 1.0:
             new_size = (int(image.get_width() * scale), 
                         int(image.get_height() * scale))
             image = pygame.transform.scale(image, new_size)
-        return image.convert_alpha()
+        image = _image_cache[key] = image.convert_alpha()
+        return image
     except pygame.error:
         print(f"Warning: Could not load image {path}")
         return pygame.Surface((32, 32))  # Return blank surface as fallback
 
+def preload_images(paths: Iterable[str], scale: float = 1.0):
+    """Warm the image cache, e.g. from a menu right after set_mode"""
+    for path in paths:
+        load_image(path, scale)
+
+# Rendered labels by (font, text, color), least recently used first
+_text_cache: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+_TEXT_CACHE_MAX = 256
+
+def render_text(text: str, font: pygame.font.Font,
+                color: Tuple[int, int, int] = (0, 0, 0)) -> pygame.Surface:
+    """Antialiased text surface, rendered once per (font, text, color)
+    
+    The surface is shared with later calls, so blit it rather than draw on it.
+    """
+    key = (font, text, tuple(color))
+    text_surface = _text_cache.get(key)
+    if text_surface is None:
+        text_surface = font.render(text, True, color)
+        if pygame.display.get_surface() is not None:
+            text_surface = text_surface.convert_alpha()
+        _text_cache[key] = text_surface
+        if len(_text_cache) > _TEXT_CACHE_MAX:
+            _text_cache.popitem(last=False)
+    else:
+        _text_cache.move_to_end(key)
+    return text_surface
+
 def draw_text(surface: pygame.Surface, text: str, pos: Tuple[int, int], 
               font: pygame.font.Font, color: Tuple[int, int, int] = (0, 0, 0)):
-    """Helper function to draw text"""
-    text_surface = font.render(text, True, color)
-    surface.blit(text_surface, pos)
+    """Helper function to draw text, rendering each distinct label once"""
+    surface.blit(render_text(text, font, color), pos)
+
+def invalidate_text_cache():
+    """Forget every rendered label, e.g. after fonts or colors change"""
+    _text_cache.clear()
 
 def create_gradient(width: int, height: int, 
                    start_color: Tuple[int, int, int], 
                    end_color: Tuple[int, int, int]) -> pygame.Surface:
-    """Create a vertical gradient surface"""
-    gradient = pygame.Surface((width, height))
+    """Create a vertical gradient surface
+    
+    Colors are filled into a one-pixel column that is then stretched to
+    full width. Results are cached, so blit from the returned surface
+    rather than drawing onto it.
+    """
+    # Colors may be passed as lists; the cache needs hashable keys
+    return _create_gradient(width, height, tuple(start_color), tuple(end_color))
+
+@lru_cache(maxsize=16)
+def _create_gradient(width: int, height: int,
+                     start_color: Tuple[int, int, int],
+                     end_color: Tuple[int, int, int]) -> pygame.Surface:
+    """Cached body of create_gradient"""
+    column = pygame.Surface((1, height))
     for y in range(height):
         # Interpolate between start and end color
         ratio = y / height
         r = int(start_color[0] + (end_color[0] - start_color[0]) * ratio)
         g = int(start_color[1] + (end_color[1] - start_color[1]) * ratio)
         b = int(start_color[2] + (end_color[2] - start_color[2]) * ratio)
-        pygame.draw.line(gradient, (r, g, b), (0, y), (width, y))
-    return gradient
\ No newline at end of file
+        column.set_at((0, y), (r, g, b))
+    return pygame.transform.scale(column, (width, height))
\ No newline at end of file
@@ -1,13 +1,26 @@
 import pygame
+import logging
+import os
 import sys
+import threading
 import time
-from game.core import CakeGame, CakeLayer
+from typing import Optional
+from game.core import CakeGame, COLORS, decode_layer, encode_layer
+from game.core_fast import slots
 from game.solver import GameSolver
-from game.utils import load_image, draw_text, create_gradient
+
+# Fired by a one-shot timer to play the next move of an auto-solve
+SOLVER_STEP = pygame.USEREVENT + 1
+SOLVER_STEP_MS = 500
+# Posted by the solver thread with the moves it found
+SOLVER_DONE = pygame.USEREVENT + 2
 
 class CakeGameUI:
     def __init__(self, width: int = 4, height: int = 5):
         pygame.init()
+        # Nothing reads motion events; blocking them lets event.wait() sleep
+        # while the pointer moves
+        pygame.event.set_blocked(pygame.MOUSEMOTION)
         self.game = CakeGame(width, height)
         self.solver = GameSolver(self.game)
         
@@ -57,35 +70,125 @@ class CakeGameUI:
         self.font = pygame.font.SysFont('Arial', 24)
         self.big_font = pygame.font.SysFont('Arial', 36)
         
+        # Static parts of the screen, blitted whole at the start of each frame
+        self._background = self._build_background()
+        # Rounded cell background shared by grid cells and queue slots
+        self._cell_sprite = self._build_cell_sprite()
+        self._highlight_sprite = self._build_highlight_sprite()
+        # Plate and per-layer-code sprites for _plate_blits
+        self._plate_sprite = self._build_plate_sprite()
+        self._layer_cache = {}
+        # Dimmed board with the "Level Complete!" box, shown by show_win_message
+        self._win_surface = self._build_win_surface()
+        
         # Game state
         self.selected_tube = None
         self.selected_layer_pos = None
         self.solving = False
         self.solution_moves = []
-        self.last_move_time = 0
+        # Background search state; results tagged with an older id are dropped
+        self._searching = False
+        self._search_id = 0
+        self._search_cancel = None
+        self._hint_requested = False
+        
+        # Screen regions to push to the display on the next draw; a full
+        # flip is used after level loads and the win overlay instead
+        self._dirty_rects = []
+        self._full_redraw = True
+        self._drawn_points = None
+        self._points_label = None
+        self._drawn_searching = False
+        self._solving_label = self.font.render("Solving...", True, self.text_color).convert_alpha()
+        # Set whenever the board, selection or queue changes; run() skips
+        # draw() entirely while it is clear
+        self._dirty = True
         
         # Load initial level
         self.load_level("game/levels/level1.txt")
     
+    def _build_background(self) -> pygame.Surface:
+        """Pre-draw everything that never changes: fill, queue strip, title, controls"""
+        background = pygame.Surface((self.screen_width, self.screen_height))
+        background.fill(self.bg_color)
+        
+        # Draw the plate queue area background
+        queue_area_rect = pygame.Rect(0, self.queue_y_position, self.screen_width, self.queue_height)
+        pygame.draw.rect(background, (220, 210, 230), queue_area_rect)  # Lighter color for the queue area
+        pygame.draw.line(background, (180, 170, 190), 
+                       (0, self.queue_y_position), 
+                       (self.screen_width, self.queue_y_position), 3)
+        
+        # Draw title
+        title = self.big_font.render("Cake Sort Puzzle", True, self.text_color)
+        title_x = self.screen_width // 2 - title.get_width() // 2
+        background.blit(title, (title_x, 20))
+        
+        # Draw controls at the bottom of the plate queue area
+        controls_text = self.font.render("1/2/3: Level   R: Reset   S: Solve   H: Hint", True, self.text_color)
+        text_x = self.screen_width // 2 - controls_text.get_width() // 2
+        background.blit(controls_text, (text_x, self.screen_height - 30))
+        
+        return background.convert()
+    
+    def _build_cell_sprite(self) -> pygame.Surface:
+        """Rasterize the rounded cell background once, to be blitted per cell"""
+        sprite = pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
+        sprite_rect = sprite.get_rect()
+        pygame.draw.rect(sprite, self.grid_color, sprite_rect, 0, 15)
+        pygame.draw.rect(sprite, self.grid_border_color, sprite_rect, 2, 15)
+        return sprite.convert_alpha()
+    
+    def _build_highlight_sprite(self) -> pygame.Surface:
+        """Selection overlay, shared by grid cells and queue slots (both cell_size)"""
+        sprite = pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
+        sprite.fill(self.selected_color)
+        return sprite.convert_alpha()
+    
     def load_level(self, filename: str):
         """Load a level from file"""
         # Use the game's existing level loading functionality
         self.game.initialize_level(filename)
+        # Layout only depends on the grid size, so it is worked out once here
+        # and looked up by draw() and handle_click()
+        self._compute_layout()
+        self._cell_rects = [self._compute_cell_rect(i) for i in range(len(self.game.tubes))]
+        self._slot_rects = [self._compute_slot_rect(i) for i in range(self.queue_slots)]
+        # Neighbour sets for the move check in handle_click
+        self._adjacency = [frozenset(self.game.get_adjacent_tubes(i)) for i in range(len(self.game.tubes))]
+        # Layer colors by COLORS index, rebuilt per level since a level file
+        # can register new color letters
+        self._color_rgb = tuple(self.color_map.get(color, (200, 200, 200)) for color in COLORS)
         self.selected_tube = None
         self.selected_layer_pos = None
         self.selected_queue_idx = None
         self.solving = False
         self.solution_moves = []
+        # A search still running belongs to the old board
+        self._cancel_search()
+        self._searching = False
+        self._search_id += 1
+        self._hint_requested = False
         
         # Initialize empty queue placeholders
         self.queue_plates = [[] for _ in range(self.queue_slots)]
+        self._full_redraw = True
+        self._dirty = True
     
     def handle_events(self):
-        for event in pygame.event.get():
+        # Sleep until input or a timer arrives instead of polling every frame
+        event = pygame.event.wait(timeout=16)
+        events = [event] + pygame.event.get() if event.type != pygame.NOEVENT else []
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
             
-            if event.type == pygame.MOUSEBUTTONDOWN and not self.solving:
+            if event.type == pygame.WINDOWEXPOSED:
+                self._full_redraw = True
+                self._dirty = True
+            
+            # The board is read by the solver thread, so it stays put while a search runs
+            if event.type == pygame.MOUSEBUTTONDOWN and not self.solving and not self._searching:
                 if event.button == 1:  # Left click
                     self.handle_click(pygame.mouse.get_pos())
             
@@ -96,6 +199,8 @@ class CakeGameUI:
                     self.start_solving('advanced')
                 elif event.key == pygame.K_b:  # Solve with BFS
                     self.start_solving('bfs')
+                elif event.key == pygame.K_i:  # Solve with IDA*
+                    self.start_solving('ida')
                 elif event.key == pygame.K_1:  # Load level 1
                     self.load_level("game/levels/level1.txt")
                 elif event.key == pygame.K_2:  # Load level 2
@@ -104,99 +209,176 @@ class CakeGameUI:
                     self.load_level("game/levels/level3.txt")
                 elif event.key == pygame.K_h:  # Hint
                     self.get_hint()
-        
-        # Auto-play solution if solving
-        if self.solving and self.solution_moves and time.time() - self.last_move_time > 0.5:
-            from_idx, layer_pos, to_idx = self.solution_moves.pop(0)
-            self.game.move_layer(from_idx, layer_pos, to_idx)
-            self.last_move_time = time.time()
-            if not self.solution_moves:
-                self.solving = False
+            
+            if event.type == SOLVER_DONE and event.search_id == self._search_id:
+                self._finish_solving(event.moves, event.elapsed)
+            
+            # Auto-play solution if solving
+            if event.type == SOLVER_STEP and self.solving and self.solution_moves:
+                from_idx, layer_pos, to_idx = self.solution_moves.pop(0)
+                if self.game.move_layer(from_idx, layer_pos, to_idx):
+                    self._mark_tube_dirty(from_idx)
+                    self._mark_tube_dirty(to_idx)
+                    self._dirty = True
+                if self.solution_moves:
+                    pygame.time.set_timer(SOLVER_STEP, SOLVER_STEP_MS, loops=1)
+                else:
+                    self.solving = False
         
         return True
     
     def get_hint(self):
         """Show the next best move"""
         if not self.solution_moves:
+            # Printed by _finish_solving once the search is done
+            self._hint_requested = True
             self.start_solving('advanced')
+        else:
+            self._print_hint()
+    
+    def _print_hint(self):
+        """Print the next move of the current solution"""
         if self.solution_moves:
             from_idx, layer_pos, to_idx = self.solution_moves[0]
             print(f"Hint: Move from tube {from_idx} (layer {layer_pos}) to tube {to_idx}")
     
     def start_solving(self, method: str):
-        """Start auto-solving the puzzle"""
+        """Start auto-solving the puzzle on a background thread"""
+        # A plan found now would be for a board that playback is still changing
+        if self._searching or self.solving:
+            return
+        self._searching = True
+        self._search_id += 1
+        self._search_cancel = threading.Event()
+        self._dirty = True
+        # Daemon, so quitting mid-search does not wait for it
+        threading.Thread(target=self._run_search, args=(self._search_id, method, self._search_cancel),
+                         daemon=True).start()
+    
+    def _cancel_search(self):
+        """Stop the running search, if any; it will not report back"""
+        if self._search_cancel is not None:
+            self._search_cancel.set()
+            self._search_cancel = None
+    
+    def _run_search(self, search_id: int, method: str, cancel: threading.Event):
+        """Solver thread: search, then hand the moves back through the event queue"""
         start_time = time.time()
-        
-        if method == 'bfs':
-            self.solution_moves = self.solver.solve_bfs()
-        else:
-            self.solution_moves = self.solver.solve_a_star(method)
-        
-        end_time = time.time()
+        moves = None
+        try:
+            if method == 'bfs':
+                moves = self.solver.solve_bfs(cancel=cancel)
+            elif method == 'ida':
+                moves = self.solver.solve_ida_star(cancel=cancel)
+            else:
+                moves = self.solver.solve_a_star(method, cancel=cancel)
+        finally:
+            # Nobody waits on a cancelled search, and after shutdown there is
+            # no event queue to post to
+            if not cancel.is_set():
+                try:
+                    pygame.event.post(pygame.event.Event(
+                        SOLVER_DONE, search_id=search_id, moves=moves, elapsed=time.time() - start_time))
+                except pygame.error:
+                    pass
+    
+    def _finish_solving(self, moves, elapsed: float):
+        """Start playing back a finished search's moves"""
+        self._searching = False
+        self._search_cancel = None
+        self._dirty = True
+        self.solution_moves = moves
+        if self._hint_requested:
+            self._hint_requested = False
+            self._print_hint()
         
         if self.solution_moves:
-            print(f"Solution found in {len(self.solution_moves)} moves! Time: {end_time-start_time:.2f}s")
+            print(f"Solution found in {len(self.solution_moves)} moves! Time: {elapsed:.2f}s")
             self.solving = True
-            self.last_move_time = time.time()
+            pygame.time.set_timer(SOLVER_STEP, SOLVER_STEP_MS, loops=1)
         else:
             print("No solution found!")
             self.solving = False
     
     def handle_click(self, mouse_pos):
         """Handle mouse clicks on tubes and queue"""
+        before = self._snapshot()
+        self._handle_click(mouse_pos)
+        self._mark_changes(before)
+        self._dirty = True
+    
+    def _handle_click(self, mouse_pos):
+        """Apply a click to the selection and the board"""
         # First check if clicking on the main grid
         if mouse_pos[1] < self.queue_y_position:
-            for tube_idx, tube in enumerate(self.game.tubes):
+            tube_idx = self._tube_at(mouse_pos)
+            if tube_idx is not None:
+                tube = self.game.tubes[tube_idx]
                 cell_rect = self.get_cell_rect(tube_idx)
-                if cell_rect.collidepoint(mouse_pos):
-                    if self.selected_tube is None and self.selected_queue_idx is None:
-                        # Select a tube and layer
-                        self.selected_tube = tube_idx
-                        # Find which layer was clicked based on distance from center
-                        center_x, center_y = cell_rect.center
-                        rel_y = mouse_pos[1] - center_y
-                        # Adjust for cake position (layers are stacked upward from the center)
-                        layers_total_height = len(tube.layers) * self.layer_height
-                        cake_top_y = center_y - layers_total_height / 2
-                        rel_layer_y = mouse_pos[1] - cake_top_y
-                        self.selected_layer_pos = min(
-                            max(0, int(rel_layer_y // self.layer_height)),
-                            len(tube.layers) - 1
-                        )
-                    elif self.selected_queue_idx is not None:
-                        # Try to place a plate from the queue onto the grid
-                        if self.place_from_queue_to_grid(self.selected_queue_idx, tube_idx):
+                if self.selected_tube is None and self.selected_queue_idx is None:
+                    # Select a tube and layer
+                    self.selected_tube = tube_idx
+                    # Find which layer was clicked based on distance from center
+                    center_x, center_y = cell_rect.center
+                    rel_y = mouse_pos[1] - center_y
+                    # Adjust for cake position (layers are stacked upward from the center)
+                    layers_total_height = len(tube.layers) * self.layer_height
+                    cake_top_y = center_y - layers_total_height / 2
+                    rel_layer_y = mouse_pos[1] - cake_top_y
+                    self.selected_layer_pos = min(
+                        max(0, int(rel_layer_y // self.layer_height)),
+                        len(tube.layers) - 1
+                    )
+                elif self.selected_queue_idx is not None:
+                    # Try to place a plate from the queue onto the grid
+                    if self.place_from_queue_to_grid(self.selected_queue_idx, tube_idx):
+                        if self.game.is_solved():
+                            self.show_win_message()
+                    self.selected_queue_idx = None
+                else:
+                    # Try to move the selected layer
+                    if tube_idx in self._adjacency[self.selected_tube]:
+                        if self.game.move_layer(self.selected_tube, self.selected_layer_pos, tube_idx):
                             if self.game.is_solved():
                                 self.show_win_message()
-                        self.selected_queue_idx = None
-                    else:
-                        # Try to move the selected layer
-                        if tube_idx in self.game.get_adjacent_tubes(self.selected_tube):
-                            if self.game.move_layer(self.selected_tube, self.selected_layer_pos, tube_idx):
-                                if self.game.is_solved():
-                                    self.show_win_message()
-                        self.selected_tube = None
-                        self.selected_layer_pos = None
+                    self.selected_tube = None
+                    self.selected_layer_pos = None
         # Check if clicking on the queue area
         else:
-            for idx, _ in enumerate(self.queue_plates):
-                slot_rect = self.get_queue_slot_rect(idx)
-                if slot_rect.collidepoint(mouse_pos):
-                    if self.selected_tube is None and self.selected_queue_idx is None:
-                        # Select this queue slot if it has a plate
-                        if self.queue_plates[idx]:
-                            self.selected_queue_idx = idx
-                    else:
-                        # Deselect everything
-                        self.selected_tube = None
-                        self.selected_layer_pos = None
-                        self.selected_queue_idx = None
+            idx = self._slot_at(mouse_pos)
+            if idx is not None:
+                if self.selected_tube is None and self.selected_queue_idx is None:
+                    # Select this queue slot if it has a plate
+                    if self.queue_plates[idx]:
+                        self.selected_queue_idx = idx
+                else:
+                    # Deselect everything
+                    self.selected_tube = None
+                    self.selected_layer_pos = None
+                    self.selected_queue_idx = None
+
+    def _tube_at(self, mouse_pos) -> Optional[int]:
+        """Grid cell under a point, from the lattice instead of hit-testing every cell"""
+        col, col_off = divmod(mouse_pos[0] - self._grid_start_x, self._pitch)
+        row, row_off = divmod(mouse_pos[1] - self._grid_start_y, self._pitch)
+        # Points in the padding between cells hit nothing
+        if (0 <= col < self.game.width and 0 <= row < self.game.height
+                and col_off < self.cell_size and row_off < self.cell_size):
+            return row * self.game.width + col
+        return None
     
-    def show_win_message(self):
-        """Display win message"""
+    def _slot_at(self, mouse_pos) -> Optional[int]:
+        """Queue slot under a point, by the same arithmetic as _tube_at"""
+        idx, x_off = divmod(mouse_pos[0] - self._queue_start_x, self._pitch)
+        if (0 <= idx < self.queue_slots and x_off < self.cell_size
+                and 0 <= mouse_pos[1] - self._queue_start_y < self.cell_size):
+            return idx
+        return None
+    
+    def _build_win_surface(self) -> pygame.Surface:
+        """Pre-draw the win overlay and message box as one surface"""
         overlay = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 150))  # Semi-transparent overlay
-        self.screen.blit(overlay, (0, 0))
         
         # Create a message box
         message_box = pygame.Rect(
@@ -204,68 +386,79 @@ class CakeGameUI:
             self.screen_height//2 - 100,
             400, 200
         )
-        pygame.draw.rect(self.screen, (255, 255, 255), message_box, 0, 20)
-        pygame.draw.rect(self.screen, (100, 100, 100), message_box, 3, 20)
+        pygame.draw.rect(overlay, (255, 255, 255), message_box, 0, 20)
+        pygame.draw.rect(overlay, (100, 100, 100), message_box, 3, 20)
         
         win_text = self.big_font.render("Level Complete!", True, (0, 180, 0))
-        self.screen.blit(win_text, 
-                       (self.screen_width//2 - win_text.get_width()//2, 
-                        self.screen_height//2 - 50))
+        overlay.blit(win_text, 
+                     (self.screen_width//2 - win_text.get_width()//2, 
+                      self.screen_height//2 - 50))
         
         continue_text = self.font.render("Press any key to continue", True, (80, 80, 80))
-        self.screen.blit(continue_text, 
-                       (self.screen_width//2 - continue_text.get_width()//2, 
-                        self.screen_height//2 + 20))
+        overlay.blit(continue_text, 
+                     (self.screen_width//2 - continue_text.get_width()//2, 
+                      self.screen_height//2 + 20))
         
+        return overlay.convert_alpha()
+    
+    def show_win_message(self):
+        """Display win message"""
+        self.screen.blit(self._win_surface, (0, 0))
         pygame.display.flip()
         waiting = True
         while waiting:
             for event in pygame.event.get():
                 if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
                     waiting = False
+                    # The overlay covered the whole board
+                    self._full_redraw = True
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
     
     def get_cell_rect(self, tube_idx: int) -> pygame.Rect:
-        """Calculate grid cell position"""
+        """Grid cell position, precomputed by load_level; treat as read-only"""
+        return self._cell_rects[tube_idx]
+    
+    def get_queue_slot_rect(self, slot_idx: int) -> pygame.Rect:
+        """Queue slot position, precomputed by load_level; treat as read-only"""
+        return self._slot_rects[slot_idx]
+    
+    def _compute_layout(self):
+        """Grid and queue origins and the cell pitch for the current grid size"""
         # Calculate grid dimensions
         grid_width = self.game.width
         grid_height = self.game.height
+        self._pitch = self.cell_size + self.grid_padding
         
         # Create a centered grid
         grid_total_width = grid_width * self.cell_size + (grid_width - 1) * self.grid_padding
         grid_total_height = grid_height * self.cell_size + (grid_height - 1) * self.grid_padding
         
-        grid_start_x = (self.screen_width - grid_total_width) // 2
+        self._grid_start_x = (self.screen_width - grid_total_width) // 2
         # Position the grid higher to make room for the queue area
-        grid_start_y = (self.screen_height - self.queue_height - grid_total_height) // 2
+        self._grid_start_y = (self.screen_height - self.queue_height - grid_total_height) // 2
         
-        # Calculate cell position
-        col = tube_idx % grid_width
-        row = tube_idx // grid_width
+        # Center the queue horizontally
+        queue_total_width = self.queue_slots * self.cell_size + (self.queue_slots - 1) * self.grid_padding
+        self._queue_start_x = (self.screen_width - queue_total_width) // 2
+        self._queue_start_y = self.queue_y_position + (self.queue_height - self.cell_size) // 2
+    
+    def _compute_cell_rect(self, tube_idx: int) -> pygame.Rect:
+        """Calculate grid cell position"""
+        col = tube_idx % self.game.width
+        row = tube_idx // self.game.width
         
-        x = grid_start_x + col * (self.cell_size + self.grid_padding)
-        y = grid_start_y + row * (self.cell_size + self.grid_padding)
+        x = self._grid_start_x + col * self._pitch
+        y = self._grid_start_y + row * self._pitch
         
         return pygame.Rect(x, y, self.cell_size, self.cell_size)
     
-    def get_queue_slot_rect(self, slot_idx: int) -> pygame.Rect:
+    def _compute_slot_rect(self, slot_idx: int) -> pygame.Rect:
         """Calculate position for a queue slot"""
         # Space the queue slots evenly
-        slot_width = self.cell_size
-        
-        # Calculate total width of all slots with padding
-        queue_total_width = self.queue_slots * slot_width + (self.queue_slots - 1) * self.grid_padding
-        
-        # Center the queue horizontally
-        queue_start_x = (self.screen_width - queue_total_width) // 2
-        
-        # Calculate the position
-        x = queue_start_x + slot_idx * (slot_width + self.grid_padding)
-        y = self.queue_y_position + (self.queue_height - slot_width) // 2
-        
-        return pygame.Rect(x, y, slot_width, slot_width)
+        x = self._queue_start_x + slot_idx * self._pitch
+        return pygame.Rect(x, self._queue_start_y, self.cell_size, self.cell_size)
         
     def place_from_queue_to_grid(self, queue_idx: int, grid_idx: int) -> bool:
         """Place cake layers from queue onto the grid"""
@@ -300,62 +493,76 @@ class CakeGameUI:
         
         return True
     
-    def draw_plate_with_layers(self, surface, center_x, center_y, layers):
-        """Draw a plate with cake layers on top"""
+    def _plate_blits(self, center_x, center_y, codes):
+        """(sprite, position) pairs drawing a plate and its layer codes, bottom first"""
         # Draw plate (white circle)
-        pygame.draw.circle(surface, self.plate_color, (center_x, center_y), self.cake_radius)
-        pygame.draw.circle(surface, (200, 200, 200), (center_x, center_y), self.cake_radius, 2)
+        plate_offset = self.cake_radius + 1
+        blit_seq = [(self._plate_sprite, (center_x - plate_offset, center_y - plate_offset))]
         
-        # Draw layers stacked upward from the plate
-        total_layers = len(layers)
-        if total_layers == 0:
-            return
-            
-        # Start drawing from the bottom layer
-        for i, layer in enumerate(layers):
-            # Calculate vertical position (stacked upward)
+        # Layers stacked upward from the plate
+        for i, code in enumerate(codes):
             layer_y = center_y - (i * self.layer_height)
-            
+            sprite, (offset_x, offset_y) = self._get_layer_sprite(code)
+            blit_seq.append((sprite, (center_x + offset_x, layer_y + offset_y)))
+        return blit_seq
+    
+    def _build_plate_sprite(self) -> pygame.Surface:
+        """Rasterize the empty plate once; its center sits at (radius + 1, radius + 1)"""
+        center = self.cake_radius + 1
+        sprite = pygame.Surface((2 * center, 2 * center), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, self.plate_color, (center, center), self.cake_radius)
+        pygame.draw.circle(sprite, (200, 200, 200), (center, center), self.cake_radius, 2)
+        return sprite.convert_alpha()
+    
+    def _get_layer_sprite(self, code: int):
+        """Pre-drawn cake layer (oval, outline and size label) and its offset from the layer center"""
+        cached = self._layer_cache.get(code)
+        if cached is None:
+            layer = decode_layer(code)
             # Create a smaller radius for the cake layer
             layer_radius = self.cake_radius * 0.85
+            size_text = self.font.render(str(layer.size), True, (0, 0, 0))
             
-            # Draw cake layer (colored circle)
-            # Get color based on the layer.color attribute from CakeLayer class
-            color = self.color_map.get(layer.color, (200, 200, 200))
-            
-            # Draw cake layer as a slightly flattened circle (oval)
+            # Lay the oval and label out around an anchor with positive coordinates,
+            # so float positions truncate exactly as they would on screen
+            anchor_x = anchor_y = self.cell_size
             layer_rect = pygame.Rect(
-                center_x - layer_radius,
-                layer_y - self.layer_height // 2,
+                anchor_x - layer_radius,
+                anchor_y - self.layer_height // 2,
                 layer_radius * 2,
                 self.layer_height
             )
-            pygame.draw.ellipse(surface, color, layer_rect)
-            pygame.draw.ellipse(surface, (100, 100, 100), layer_rect, 1)
+            text_rect = size_text.get_rect(topleft=(anchor_x - size_text.get_width() // 2,
+                                                    anchor_y - size_text.get_height() // 2))
+            bounds = layer_rect.union(text_rect)
             
-            # Draw layer size at the center of the layer
-            size_text = self.font.render(str(layer.size), True, (0, 0, 0))
-            text_x = center_x - size_text.get_width() // 2
-            text_y = layer_y - size_text.get_height() // 2
-            surface.blit(size_text, (text_x, text_y))
+            # Draw cake layer as a slightly flattened circle (oval), size label on top
+            sprite = pygame.Surface(bounds.size, pygame.SRCALPHA)
+            layer_rect.move_ip(-bounds.x, -bounds.y)
+            pygame.draw.ellipse(sprite, self._color_rgb[layer.color], layer_rect)
+            pygame.draw.ellipse(sprite, (100, 100, 100), layer_rect, 1)
+            sprite.blit(size_text, (text_rect.x - bounds.x, text_rect.y - bounds.y))
+            
+            cached = (sprite.convert_alpha(), (bounds.x - anchor_x, bounds.y - anchor_y))
+            self._layer_cache[code] = cached
+        return cached
     
     def draw(self):
         """Draw the game state"""
-        self.screen.fill(self.bg_color)
+        # Everything is queued here and handed to SDL in one blits() call;
+        # the static background, queue strip, title and controls come first
+        blit_seq = [(self._background, (0, 0))]
         
         # Draw grid background
         for tube_idx in range(len(self.game.tubes)):
             cell_rect = self.get_cell_rect(tube_idx)
             
             # Draw cell background with rounded corners
-            pygame.draw.rect(self.screen, self.grid_color, cell_rect, 0, 15)
-            pygame.draw.rect(self.screen, self.grid_border_color, cell_rect, 2, 15)
+            blit_seq.append((self._cell_sprite, cell_rect.topleft))
             
             # Highlight selected cell
             if tube_idx == self.selected_tube:
-                highlight = pygame.Surface((cell_rect.width, cell_rect.height), pygame.SRCALPHA)
-                highlight.fill(self.selected_color)
-                self.screen.blit(highlight, cell_rect.topleft)
+                blit_seq.append((self._highlight_sprite, cell_rect.topleft))
         
         # Draw cakes with layers in the grid
         for tube_idx, tube in enumerate(self.game.tubes):
@@ -363,62 +570,120 @@ class CakeGameUI:
             center_x, center_y = cell_rect.center
             
             # Draw the plate with cake layers
-            self.draw_plate_with_layers(self.screen, center_x, center_y, tube.layers)
-        
-        # Draw the plate queue area background
-        queue_area_rect = pygame.Rect(0, self.queue_y_position, self.screen_width, self.queue_height)
-        pygame.draw.rect(self.screen, (220, 210, 230), queue_area_rect)  # Lighter color for the queue area
-        pygame.draw.line(self.screen, (180, 170, 190), 
-                       (0, self.queue_y_position), 
-                       (self.screen_width, self.queue_y_position), 3)
+            # Layer codes come straight from the packed tube, no CakeLayer objects
+            blit_seq.extend(self._plate_blits(center_x, center_y, slots(tube.state)))
         
         # Draw queue slots and plates (without the "Cake Queue" label)
         for idx in range(self.queue_slots):
             slot_rect = self.get_queue_slot_rect(idx)
             
             # Draw slot background
-            pygame.draw.rect(self.screen, self.grid_color, slot_rect, 0, 15)
-            pygame.draw.rect(self.screen, self.grid_border_color, slot_rect, 2, 15)
+            blit_seq.append((self._cell_sprite, slot_rect.topleft))
             
             # Highlight selected queue slot
             if idx == self.selected_queue_idx:
-                highlight = pygame.Surface((slot_rect.width, slot_rect.height), pygame.SRCALPHA)
-                highlight.fill(self.selected_color)
-                self.screen.blit(highlight, slot_rect.topleft)
+                blit_seq.append((self._highlight_sprite, slot_rect.topleft))
             
             # Draw plates in queue
             if idx < len(self.queue_plates) and self.queue_plates[idx]:
                 center_x, center_y = slot_rect.center
-                self.draw_plate_with_layers(self.screen, center_x, center_y, self.queue_plates[idx])
-        
-        # Draw title
-        title = self.big_font.render("Cake Sort Puzzle", True, self.text_color)
-        title_x = self.screen_width // 2 - title.get_width() // 2
-        self.screen.blit(title, (title_x, 20))
-        
-        # Points display below the title with more space
-        points_text = self.font.render(f"Points: {self.points}", True, (0, 150, 0))
-        points_x = self.screen_width // 2 - points_text.get_width() // 2
-        self.screen.blit(points_text, (points_x, 70))
-        
-        # Draw controls at the bottom of the plate queue area
-        controls_text = self.font.render("1/2/3: Level   R: Reset   S: Solve   H: Hint", True, self.text_color)
-        text_x = self.screen_width // 2 - controls_text.get_width() // 2
-        self.screen.blit(controls_text, (text_x, self.screen_height - 30))
-        
-        pygame.display.flip()
+                codes = [encode_layer(layer) for layer in self.queue_plates[idx]]
+                blit_seq.extend(self._plate_blits(center_x, center_y, codes))
+        
+        # Points display below the title with more space; the label is only
+        # re-rendered when the score changes
+        if self.points != self._drawn_points:
+            self._drawn_points = self.points
+            self._points_label = self.font.render(f"Points: {self.points}", True, (0, 150, 0)).convert_alpha()
+            self._dirty_rects.append(self._status_band())
+        points_x = self.screen_width // 2 - self._points_label.get_width() // 2
+        blit_seq.append((self._points_label, (points_x, 70)))
+        
+        # Shown on the points line while the solver thread runs
+        if self._searching != self._drawn_searching:
+            self._drawn_searching = self._searching
+            self._dirty_rects.append(self._status_band())
+        if self._searching:
+            blit_seq.append((self._solving_label, (self.margin, 70)))
+        
+        # Push only what changed; an untouched frame needs no display update
+        if self._full_redraw:
+            self.screen.blits(blit_seq, doreturn=False)
+            pygame.display.flip()
+        elif self._dirty_rects:
+            # Outside the dirty rects the screen still holds the last frame, so
+            # the sequence is only replayed clipped to each of them
+            for rect in self._dirty_rects:
+                self.screen.set_clip(rect)
+                self.screen.blits(blit_seq, doreturn=False)
+            self.screen.set_clip(None)
+            pygame.display.update(self._dirty_rects)
+        self._full_redraw = False
+        self._dirty_rects = []
+    
+    def _status_band(self) -> pygame.Rect:
+        """Full-width strip holding the points and "Solving..." labels"""
+        # Rendered text can run a pixel or two past font.get_height()
+        height = max(self.font.get_linesize(), self._points_label.get_height(),
+                     self._solving_label.get_height())
+        return pygame.Rect(0, 70, self.screen_width, height)
+    
+    def _stack_rect(self, cell_rect: pygame.Rect) -> pygame.Rect:
+        """Screen area a cell's plate can paint, including a full layer stack
+        
+        Stacks grow upward past the top of their own cell, so this reaches
+        up by a full tube of layers plus a size label.
+        """
+        top = cell_rect.centery - (self.game.max_capacity - 1) * self.layer_height - self.font.get_height()
+        top = min(top, cell_rect.top)
+        return pygame.Rect(cell_rect.left, top, cell_rect.width, cell_rect.bottom - top)
+    
+    def _mark_tube_dirty(self, tube_idx: int):
+        """Queue a grid cell (and the stack above it) for the next display update"""
+        self._dirty_rects.append(self._stack_rect(self.get_cell_rect(tube_idx)))
+    
+    def _mark_slot_dirty(self, slot_idx: int):
+        """Queue a queue slot for the next display update"""
+        self._dirty_rects.append(self._stack_rect(self.get_queue_slot_rect(slot_idx)))
+    
+    def _snapshot(self):
+        """Everything a click can change on screen, for _mark_changes"""
+        return (self.game.get_state(), self.selected_tube, self.selected_queue_idx,
+                [list(plate) for plate in self.queue_plates])
+    
+    def _mark_changes(self, before):
+        """Queue the cells and slots that differ from an earlier _snapshot"""
+        state, selected_tube, selected_queue_idx, queue_plates = before
+        for tube_idx, (old, new) in enumerate(zip(state, self.game.get_state())):
+            if old != new:
+                self._mark_tube_dirty(tube_idx)
+        if selected_tube != self.selected_tube:
+            for tube_idx in (selected_tube, self.selected_tube):
+                if tube_idx is not None:
+                    self._mark_tube_dirty(tube_idx)
+        for idx, plate in enumerate(queue_plates):
+            if plate != self.queue_plates[idx] or (
+                    selected_queue_idx != self.selected_queue_idx and idx in (selected_queue_idx, self.selected_queue_idx)):
+                self._mark_slot_dirty(idx)
     
     def run(self):
         """Main game loop"""
         running = True
         while running:
             running = self.handle_events()
-            self.draw()
+            # Idle frames cost nothing; the tick still bounds how often we wake
+            if self._dirty:
+                self.draw()
+                self._dirty = False
             self.clock.tick(60)
         
+        self._cancel_search()
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
+    # CAKEGAME_DEBUG=1 turns on the debug logging of the game modules
+    if os.environ.get("CAKEGAME_DEBUG") == "1":
+        logging.basicConfig(level=logging.DEBUG)
     game_ui = CakeGameUI()
     game_ui.run()
\ No newline at end of file
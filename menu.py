@@ -1,11 +1,14 @@
 import pygame
 import sys
 from game.core import CakeGame
-from game.utils import draw_text
+from game.utils import draw_text, render_text
 
 class CakeMenuUI:
     def __init__(self, game_ui_class):
         pygame.init()
+        # Hover is read from pygame.mouse.get_pos(), so motion events are never
+        # used; keep SDL from queueing (and us from draining) one per pixel moved
+        pygame.event.set_blocked(pygame.MOUSEMOTION)
         
         # Store the game UI class for starting the game
         self.game_ui_class = game_ui_class
@@ -37,6 +40,10 @@ class CakeMenuUI:
         self.button_height = 80
         self.button_padding = 20
         
+        # Persistent layout rects, keyed by row y position
+        self._button_rects = {}
+        self._rules_rects = {}
+        
         # Clock for frame rate
         self.clock = pygame.time.Clock()
         
@@ -51,11 +58,26 @@ class CakeMenuUI:
             "• Complete levels by sorting all cakes by color",
             "• Use the queue at the bottom to place new cakes"
         ]
+        
+        # Static background, title and level selector frame, drawn once
+        self.level_selector_y = 200
+        self._chrome = self._build_chrome()
+        
+        # Redraw tracking: set on clicks, compared against hover each frame
+        self._dirty = True
+        self._last_hover = None
     
     def get_button_rect(self, y_position):
-        """Get centered button rectangle at specified y position"""
-        x = (self.screen_width - self.button_width) // 2
-        return pygame.Rect(x, y_position, self.button_width, self.button_height)
+        """Get centered button rectangle at specified y position
+        
+        Rects are built once per row and shared, so treat them as read-only.
+        """
+        button_rect = self._button_rects.get(y_position)
+        if button_rect is None:
+            x = (self.screen_width - self.button_width) // 2
+            button_rect = pygame.Rect(x, y_position, self.button_width, self.button_height)
+            self._button_rects[y_position] = button_rect
+        return button_rect
     
     def draw_button(self, text, y_position, hover=False):
         """Draw a button with text at the specified y position"""
@@ -67,44 +89,46 @@ class CakeMenuUI:
         pygame.draw.rect(self.screen, self.button_border_color, button_rect, 2, 15)
         
         # Button text
-        text_surf = self.button_font.render(text, True, self.text_color)
+        text_surf = render_text(text, self.button_font, self.text_color)
         text_rect = text_surf.get_rect(center=button_rect.center)
         self.screen.blit(text_surf, text_rect)
         
         return button_rect
     
-    def draw_level_selector(self, y_position):
-        """Draw a level selector with left/right arrows"""
-        # Main button with level text
-        button_rect = self.get_button_rect(y_position)
-        
-        # Button background
-        pygame.draw.rect(self.screen, self.button_color, button_rect, 0, 15)
-        pygame.draw.rect(self.screen, self.button_border_color, button_rect, 2, 15)
-        
-        # Level text
+    def draw_level_selector(self):
+        """Draw the selected level's name into the pre-drawn level selector"""
+        button_rect = self._level_rects[0]
         level_text = self.levels[self.selected_level]
-        text_surf = self.button_font.render(level_text, True, self.text_color)
+        text_surf = render_text(level_text, self.button_font, self.text_color)
         text_rect = text_surf.get_rect(center=button_rect.center)
         self.screen.blit(text_surf, text_rect)
         
-        # Left arrow button
-        left_arrow_rect = pygame.Rect(button_rect.x - 60, button_rect.y, 50, button_rect.height)
-        pygame.draw.rect(self.screen, self.button_color, left_arrow_rect, 0, 15)
-        pygame.draw.rect(self.screen, self.button_border_color, left_arrow_rect, 2, 15)
-        left_text = self.button_font.render("<", True, self.text_color)
-        left_text_rect = left_text.get_rect(center=left_arrow_rect.center)
-        self.screen.blit(left_text, left_text_rect)
+        return self._level_rects
+    
+    def _build_chrome(self):
+        """Draw the parts of the menu that never change onto one surface"""
+        chrome = pygame.Surface((self.screen_width, self.screen_height))
+        chrome.fill(self.bg_color)
         
-        # Right arrow button
+        # Title
+        title_surf = render_text("Cake Sort Puzzle", self.title_font, self.text_color)
+        title_rect = title_surf.get_rect(center=(self.screen_width // 2, 100))
+        chrome.blit(title_surf, title_rect)
+        
+        # Level selector frame with left/right arrows; the level name is drawn per frame
+        button_rect = self.get_button_rect(self.level_selector_y)
+        left_arrow_rect = pygame.Rect(button_rect.x - 60, button_rect.y, 50, button_rect.height)
         right_arrow_rect = pygame.Rect(button_rect.x + button_rect.width + 10, button_rect.y, 50, button_rect.height)
-        pygame.draw.rect(self.screen, self.button_color, right_arrow_rect, 0, 15)
-        pygame.draw.rect(self.screen, self.button_border_color, right_arrow_rect, 2, 15)
-        right_text = self.button_font.render(">", True, self.text_color)
-        right_text_rect = right_text.get_rect(center=right_arrow_rect.center)
-        self.screen.blit(right_text, right_text_rect)
+        for rect in (button_rect, left_arrow_rect, right_arrow_rect):
+            pygame.draw.rect(chrome, self.button_color, rect, 0, 15)
+            pygame.draw.rect(chrome, self.button_border_color, rect, 2, 15)
+        for arrow, rect in (("<", left_arrow_rect), (">", right_arrow_rect)):
+            arrow_surf = render_text(arrow, self.button_font, self.text_color)
+            chrome.blit(arrow_surf, arrow_surf.get_rect(center=rect.center))
         
-        return button_rect, left_arrow_rect, right_arrow_rect
+        self._level_rects = (button_rect, left_arrow_rect, right_arrow_rect)
+        # Match the display's pixel format so the per-frame blit is a straight copy
+        return chrome.convert()
     
     def draw_rules_dropdown(self, y_position):
         """Draw rules dropdown button and content if expanded"""
@@ -120,19 +144,22 @@ class CakeMenuUI:
         # Button text with dropdown indicator
         dropdown_symbol = "▼" if not self.rules_expanded else "▲"
         text = f"Game Rules"
-        text_surf = self.button_font.render(text, True, self.text_color)
+        text_surf = render_text(text, self.button_font, self.text_color)
         text_rect = text_surf.get_rect(center=button_rect.center)
         self.screen.blit(text_surf, text_rect)
         
         # Draw expanded content if needed
         if self.rules_expanded:
-            rules_height = len(self.rules) * 30 + 40  # Height based on number of lines
-            rules_rect = pygame.Rect(
-                button_rect.x,
-                button_rect.bottom + 5,
-                button_rect.width,
-                rules_height
-            )
+            rules_rect = self._rules_rects.get(y_position)
+            if rules_rect is None:
+                rules_height = len(self.rules) * 30 + 40  # Height based on number of lines
+                rules_rect = pygame.Rect(
+                    button_rect.x,
+                    button_rect.bottom + 5,
+                    button_rect.width,
+                    rules_height
+                )
+                self._rules_rects[y_position] = rules_rect
             
             # Rules content background
             pygame.draw.rect(self.screen, (255, 255, 255, 200), rules_rect, 0, 15)
@@ -140,11 +167,11 @@ class CakeMenuUI:
             
             # Rules text
             header = "How to Play:"
-            header_surf = self.text_font.render(header, True, self.text_color)
+            header_surf = render_text(header, self.text_font, self.text_color)
             self.screen.blit(header_surf, (rules_rect.x + 20, rules_rect.y + 15))
             
             for i, line in enumerate(self.rules):
-                text_surf = self.text_font.render(line, True, self.text_color)
+                text_surf = render_text(line, self.text_font, self.text_color)
                 self.screen.blit(text_surf, (rules_rect.x + 20, rules_rect.y + 45 + i * 30))
             
             return button_rect, rules_rect
@@ -153,15 +180,11 @@ class CakeMenuUI:
     
     def draw(self):
         """Draw the menu screen"""
-        self.screen.fill(self.bg_color)
-        
-        # Title
-        title_surf = self.title_font.render("Cake Sort Puzzle", True, self.text_color)
-        title_rect = title_surf.get_rect(center=(self.screen_width // 2, 100))
-        self.screen.blit(title_surf, title_rect)
+        # Background, title and level selector frame in one blit
+        self.screen.blit(self._chrome, (0, 0))
         
-        # Level selector (y position 200)
-        level_rects = self.draw_level_selector(200)
+        # Level name
+        level_rects = self.draw_level_selector()
         
         # Rules dropdown (y position 300)
         rules_button_y = 300
@@ -191,6 +214,14 @@ class CakeMenuUI:
         button_rect = self.get_button_rect(button_y)
         return button_rect.collidepoint(mouse_pos)
     
+    def get_hover_state(self, button_rects):
+        """Which hover-highlighted buttons the mouse is over, for redraw checks"""
+        if button_rects is None:
+            return None
+        mouse_pos = pygame.mouse.get_pos()
+        return (button_rects['rules'].collidepoint(mouse_pos),
+                button_rects['start'].collidepoint(mouse_pos))
+    
     def handle_events(self, button_rects):
         """Handle user input events"""
         for event in pygame.event.get():
@@ -200,6 +231,7 @@ class CakeMenuUI:
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 # Left click
                 mouse_pos = pygame.mouse.get_pos()
+                self._dirty = True
                 
                 # Check level selector
                 level_rect, left_arrow, right_arrow = button_rects['level']
@@ -221,8 +253,14 @@ class CakeMenuUI:
     def run(self):
         """Main menu loop"""
         running = True
+        button_rects = None
         while running:
-            button_rects = self.draw()
+            # Repaint only after a click or when the hovered button changes
+            hover = self.get_hover_state(button_rects)
+            if self._dirty or hover != self._last_hover:
+                button_rects = self.draw()
+                self._dirty = False
+                self._last_hover = self.get_hover_state(button_rects)
             running, action = self.handle_events(button_rects)
             
             if action == 'start_game':
@@ -235,6 +273,7 @@ class CakeMenuUI:
                 # After the game loop ends, recreate the menu display
                 pygame.display.set_mode((self.screen_width, self.screen_height))
                 pygame.display.set_caption("Cake Sort Puzzle - Menu")
+                self._dirty = True
                 running = True
             
             self.clock.tick(60)
@@ -250,19 +289,3 @@ if __name__ == "__main__":
     
     menu = CakeMenuUI(CakeGameUI)
     menu.run()
-
-
-# Example usage
-if __name__ == "__main__":
-    # Import the game UI class to avoid circular imports
-    from main import CakeGameUI
-    
-    menu = CakeMenuUI(CakeGameUI)
-    menu.run()
-
-if __name__ == "__main__":
-    # Import the game UI class to avoid circular imports
-    from main import CakeGameUI
-    
-    menu = CakeMenuUI(CakeGameUI)
-    menu.run()
\ No newline at end of file